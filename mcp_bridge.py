@@ -1,11 +1,36 @@
 import asyncio
+from contextlib import asynccontextmanager
+
 import httpx
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, Request
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.background import BackgroundTask
 import uvicorn
 
-app = FastAPI(title="MCP Bridge Service")
+# Configuration for the real MCP server
+MCP_URL = "http://localhost:18888/mcp"
+
+# Request headers not forwarded upstream (ASGI header names are already lower-case bytes)
+DROP_HEADERS = frozenset((b"host", b"connection", b"content-length"))
+SSE_DROP_HEADERS = DROP_HEADERS | {b"accept", b"accept-encoding"}
+
+# Hop-by-hop / framing headers that must not be copied from the upstream response
+HOP_BY_HOP = frozenset(("connection", "keep-alive", "transfer-encoding", "content-length"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # ♻️ One pooled client for the whole process (keep-alive instead of a new socket per call)
+    app.state.http_client = httpx.AsyncClient(
+        timeout=httpx.Timeout(None, connect=5.0),
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=128),
+    )
+    try:
+        yield
+    finally:
+        await app.state.http_client.aclose()
+
+app = FastAPI(title="MCP Bridge Service", lifespan=lifespan)
 
 # 🔓 Enable CORS for everything (since it's a local dashboard bridge)
 app.add_middleware(
@@ -16,9 +41,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configuration for the real MCP server
-MCP_URL = "http://localhost:18888/mcp"
-
 @app.api_route("/mcp", methods=["GET", "POST", "DELETE", "OPTIONS"])
 async def proxy_mcp(request: Request):
     """
@@ -28,40 +50,48 @@ async def proxy_mcp(request: Request):
     - DELETE: For session cleanup
     """
     method = request.method
+    client: httpx.AsyncClient = request.app.state.http_client
     
-    # Simple header filtering to avoid interference
-    headers = {k: v for k, v in request.headers.items() if k.lower() not in ("host", "connection", "content-length")}
+    raw_headers = request.headers.raw
     
-    body = await request.body()
+    if method == "GET":
+        # 📡 Handle SSE Streaming
+        # Forward raw byte chunks verbatim: no per-line decode/re-encode
+        sse_headers = [(k, v) for k, v in raw_headers if k not in SSE_DROP_HEADERS]
+        sse_headers += [(b"accept", b"text/event-stream"), (b"accept-encoding", b"identity")]
+
+        async def event_generator():
+            async with client.stream("GET", MCP_URL, headers=sse_headers) as response:
+                async for chunk in response.aiter_raw(65536):
+                    yield chunk
+        
+        return StreamingResponse(
+            event_generator(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
     
-    async with httpx.AsyncClient(timeout=None) as client:
-        if method == "GET":
-            # 📡 Handle SSE Streaming
-            async def event_generator():
-                async with client.stream("GET", MCP_URL, headers=headers) as response:
-                    async for line in response.aiter_lines():
-                        if line:
-                            yield f"{line}\n"
-                        else:
-                            yield "\n"
-            
-            return StreamingResponse(event_generator(), media_type="text/event-stream")
+    else:
+        # 📨 Handle POST/DELETE (streamed both ways, nothing is buffered in the bridge)
+        headers = [(k, v) for k, v in raw_headers if k not in DROP_HEADERS]
+        upstream_request = client.build_request(
+            method,
+            MCP_URL,
+            content=request.stream(),
+            headers=headers,
+            params=request.query_params
+        )
+        response = await client.send(upstream_request, stream=True)
+        
+        # aiter_raw() yields the still-encoded body, so content-encoding is kept as-is
+        response_headers = {k: v for k, v in response.headers.items() if k.lower() not in HOP_BY_HOP}
         
-        else:
-            # 📨 Handle POST/DELETE
-            response = await client.request(
-                method,
-                MCP_URL,
-                content=body,
-                headers=headers,
-                params=request.query_params
-            )
-            
-            return Response(
-                content=response.content,
-                status_code=response.status_code,
-                headers=dict(response.headers)
-            )
+        return StreamingResponse(
+            response.aiter_raw(65536),
+            status_code=response.status_code,
+            headers=response_headers,
+            background=BackgroundTask(response.aclose)
+        )
 
 @app.get("/")
 def health():
@@ -70,4 +100,5 @@ def health():
 if __name__ == "__main__":
     print(f"🚀 MCP Bridge running on http://localhost:18889")
     print(f"📡 Proxying requests to {MCP_URL}")
-    uvicorn.run(app, host="0.0.0.0", port=18889)
+    # uvloop + httptools are picked automatically when uvicorn[standard] is installed
+    uvicorn.run(app, host="0.0.0.0", port=18889, log_level="warning", access_log=False)
@@ -1,15 +1,163 @@
 import asyncio
+import hashlib
 import json
+import os
+import re
+import time
 import traceback
-from typing import Dict, Any
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Any, Callable, Dict
 
-from fastapi import FastAPI, HTTPException
+import httpx
+import orjson
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from mcp import ClientSession
 from mcp.client.streamable_http import streamable_http_client
+from mcp.shared.exceptions import McpError
+from mcp.types import INTERNAL_ERROR, INVALID_PARAMS, METHOD_NOT_FOUND
 from pydantic import BaseModel
 
-app = FastAPI()
+MCP_URL = "http://localhost:18888/mcp"
+
+# Upper bound for one MCP round-trip, so a stuck upstream cannot hang a dashboard request forever.
+# Generous by default: History Server queries on large applications can take minutes.
+MCP_TIMEOUT = timedelta(seconds=float(os.getenv("MCP_TIMEOUT_SECONDS", "600")))
+
+# Errors that only fail the call that raised them: JSON-RPC errors from the tool/method itself and
+# read timeouts (reported by the MCP client as 408). Any other failure means the session is unusable.
+CALL_ERROR_CODES = frozenset((METHOD_NOT_FOUND, INVALID_PARAMS, INTERNAL_ERROR, httpx.codes.REQUEST_TIMEOUT))
+
+# orjson only handles 64-bit integers (wider ones are read back as floats and cannot be written),
+# so tool results that may contain them go through stdlib json end to end
+WIDE_INT = re.compile(r"\d{19}")
+
+# The tool list only changes when the MCP server is redeployed, so dashboard polls are served from memory
+TOOLS_CACHE_TTL = 30
+tools_cache_lock = asyncio.Lock()
+
+class MCPConnection:
+    """One initialized MCP session shared by every request, reopened lazily after a failure."""
+
+    def __init__(self, url: str, on_reset: Callable[[], None] | None = None):
+        self.url = url
+        # Called whenever an established session goes away (reset or transport failure)
+        self.on_reset = on_reset
+        # Bumped each time a session goes away, so callers can tell a result came from an old session
+        self.generation = 0
+        self.session: ClientSession | None = None
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._closing: asyncio.Event | None = None
+        self._closed: asyncio.Event | None = None
+
+    async def _run(self, ready: asyncio.Future, closed: asyncio.Event):
+        # The transport's task group must be entered and exited by the same task,
+        # so a dedicated task owns the connection until we ask it to close.
+        session = None
+        try:
+            async with streamable_http_client(self.url) as (read, write, _):
+                async with ClientSession(read, write, read_timeout_seconds=MCP_TIMEOUT) as session:
+                    await session.initialize()
+                    self.session = session
+                    ready.set_result(session)
+                    await self._closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                print(f"⚠️ MCP session closed: {e}")
+        finally:
+            # Once the transport is gone the session must not be handed out again
+            if session is not None:
+                if self.session is session:
+                    self.session = None
+                self.generation += 1
+                if self.on_reset is not None:
+                    self.on_reset()
+            if self._task is asyncio.current_task():
+                self._task = None
+            closed.set()
+            if not ready.done():
+                ready.set_exception(ConnectionError("MCP session closed before it was initialized"))
+
+    async def get(self) -> tuple[ClientSession, asyncio.Event]:
+        """Return the current session and the event set when its transport closes."""
+        async with self._lock:
+            if self.session is None:
+                print(f"🔌 Opening MCP session to {self.url}...")
+                self._closing = asyncio.Event()
+                self._closed = closed = asyncio.Event()
+                ready = asyncio.get_running_loop().create_future()
+                self._task = asyncio.create_task(self._run(ready, closed))
+                return await ready, closed
+            return self.session, self._closed
+
+    async def request(self, method: str, *args):
+        """Call `ClientSession.<method>`, failing as soon as the transport drops rather than at MCP_TIMEOUT.
+
+        A failure that leaves the session unusable resets it, unless another request already replaced it.
+        """
+        session, closed = await self.get()
+        call = asyncio.ensure_future(getattr(session, method)(*args))
+        closed_wait = asyncio.ensure_future(closed.wait())
+        try:
+            await asyncio.wait((call, closed_wait), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            closed_wait.cancel()
+            call.cancel()
+        try:
+            if not call.done() or call.cancelled():
+                raise ConnectionError("MCP session closed")
+            return call.result()
+        except Exception as e:
+            if session_lost(e):
+                await self.reset(session)
+            raise
+
+    async def reset(self, session: ClientSession | None = None):
+        """Close the current session; when `session` is given, only if it is still the current one."""
+        async with self._lock:
+            if session is not None and self.session is not session:
+                return
+            self.session = None
+            task = self._task
+            if task is not None:
+                self._closing.set()
+                await asyncio.gather(task, return_exceptions=True)
+                self._task = None
+
+def parse_tool_text(text: str) -> tuple[Any, bool]:
+    """Decode a JSON tool result, passing text that is not JSON through unchanged.
+
+    Also reports whether the text may hold integers wider than 64 bits, which orjson cannot write back.
+    """
+    wide_ints = WIDE_INT.search(text) is not None
+    if not wide_ints:
+        try:
+            return orjson.loads(text), False
+        except orjson.JSONDecodeError:
+            pass  # still try stdlib json, which also accepts NaN/Infinity
+    try:
+        return json.loads(text), wide_ints
+    except ValueError:
+        return text, wide_ints
+
+def session_lost(e: Exception) -> bool:
+    """Whether `e` leaves the shared session unusable (transport failure, upstream restart)."""
+    return not (isinstance(e, McpError) and e.error.code in CALL_ERROR_CODES)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        yield
+    finally:
+        await mcp_connection.reset()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,53 +166,84 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def clear_tools_cache():
+    # A reconnect may land on a redeployed upstream with a different tool list
+    app.state.tools_cache = None
+
+mcp_connection = MCPConnection(MCP_URL, on_reset=clear_tools_cache)
+
 class ToolCallRequest(BaseModel):
     name: str
     arguments: Dict[str, Any] = {}
 
-MCP_URL = "http://localhost:18888/mcp"
-
 @app.get("/api/status")
 async def get_status():
     # We are always "connected" in the sense that we can try to connect
     return {"connected": True}
 
+async def refresh_tools_cache():
+    """Fetch and serialize the tool list, once for all concurrent cache misses."""
+    async with tools_cache_lock:
+        cached = getattr(app.state, "tools_cache", None)
+        if cached is not None and time.monotonic() < cached[0]:
+            return cached
+        
+        print(f"🔍 Fetching tools from {MCP_URL}...")
+        generation = mcp_connection.generation
+        try:
+            result = await mcp_connection.request("list_tools")
+        except Exception as e:
+            print(f"❌ Error fetching tools: {e}")
+            traceback.print_exc()
+            raise HTTPException(503, str(e))
+        
+        payload = jsonable_encoder(result)
+        try:
+            body = orjson.dumps(payload)
+        except TypeError:
+            # Integers wider than 64 bits in a tool schema, see WIDE_INT
+            body = json.dumps(payload, separators=(",", ":")).encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        cached = (time.monotonic() + TOOLS_CACHE_TTL, etag, body)
+        # A list fetched on a session that has since gone away is served once but never cached
+        if mcp_connection.generation == generation:
+            app.state.tools_cache = cached
+        return cached
+
 @app.get("/api/tools")
-async def list_tools():
-    print(f"🔍 Fetching tools from {MCP_URL}...")
-    try:
-        async with streamable_http_client(MCP_URL) as (read, write, _):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                result = await session.list_tools()
-                return result
-    except Exception as e:
-        print(f"❌ Error fetching tools: {e}")
-        traceback.print_exc()
-        raise HTTPException(503, str(e))
+async def list_tools(request: Request):
+    cached = getattr(app.state, "tools_cache", None)
+    if cached is None or time.monotonic() >= cached[0]:
+        cached = await refresh_tools_cache()
+    
+    _, etag, body = cached
+    headers = {"ETag": etag, "Cache-Control": f"max-age={TOOLS_CACHE_TTL}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.post("/api/tools/call")
 async def call_tool(req: ToolCallRequest):
     print(f"⚙️ Calling {req.name}...")
     try:
-        async with streamable_http_client(MCP_URL) as (read, write, _):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                result = await session.call_tool(req.name, req.arguments)
-                
-                # Simple JSON unwrapping
-                parsed = []
-                if result.content:
-                    for item in result.content:
-                        if hasattr(item, 'text'):
-                            try:
-                                parsed.append(json.loads(item.text))
-                            except:
-                                parsed.append(item.text)
-                        else:
-                            parsed.append(item)
-                
-                return {"result": parsed, "isError": result.isError}
+        result = await mcp_connection.request("call_tool", req.name, req.arguments)
+        
+        # Simple JSON unwrapping
+        parsed = []
+        wide_ints = False
+        if result.content:
+            for item in result.content:
+                if hasattr(item, 'text'):
+                    value, item_wide_ints = parse_tool_text(item.text)
+                    parsed.append(value)
+                    wide_ints = wide_ints or item_wide_ints
+                else:
+                    parsed.append(item)
+        
+        payload = {"result": parsed, "isError": result.isError}
+        if wide_ints:
+            return JSONResponse(jsonable_encoder(payload))
+        return payload
     except Exception as e:
         print(f"❌ Error calling tool: {e}")
         traceback.print_exc()
@@ -72,4 +251,15 @@ async def call_tool(req: ToolCallRequest):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=3000)
+    workers = int(os.getenv("SERVER_WORKERS", "2"))
+    print(f"🚀 Dashboard backend running on http://localhost:3000 ({workers} workers)", flush=True)
+    print(f"📡 Relaying tool calls to {MCP_URL}", flush=True)
+    # uvloop + httptools are picked automatically when uvicorn[standard] is installed
+    uvicorn.run(
+        "server:app",
+        host="0.0.0.0",
+        port=3000,
+        workers=workers,
+        log_level="warning",
+        access_log=False
+    )
@@ -0,0 +1,120 @@
+import gzip
+import json
+
+import httpx
+import pytest
+
+import mcp_bridge
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+async def echo_upstream(scope, receive, send):
+    """Stand-in for the MCP server: echoes what it received, gzip-encoded when the client accepts it."""
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+
+    headers = {k.decode(): v.decode() for k, v in scope["headers"]}
+    if scope["method"] == "GET":
+        content_type = b"text/event-stream"
+        payload = f"data: {headers['accept']}\n\ndata: {headers['accept-encoding']}\n\n".encode()
+    else:
+        content_type = b"application/json"
+        payload = json.dumps({
+            "method": scope["method"],
+            "headers": [[k.decode(), v.decode()] for k, v in scope["headers"]],
+            "body": body.decode(),
+        }).encode()
+
+    response_headers = [(b"content-type", content_type)]
+    if "gzip" in headers.get("accept-encoding", ""):
+        response_headers.append((b"content-encoding", b"gzip"))
+        payload = gzip.compress(payload)
+
+    await send({"type": "http.response.start", "status": 200, "headers": response_headers})
+    await send({"type": "http.response.body", "body": payload})
+
+
+class TrackedUpstream(httpx.AsyncBaseTransport):
+    """ASGI upstream that records whether each response stream was closed by the bridge."""
+
+    def __init__(self):
+        self.transport = httpx.ASGITransport(app=echo_upstream)
+        self.open_responses = 0
+
+    async def handle_async_request(self, request):
+        response = await self.transport.handle_async_request(request)
+        self.open_responses += 1
+        upstream = self
+
+        class Stream(httpx.AsyncByteStream):
+            async def __aiter__(self):
+                async for chunk in response.stream:
+                    yield chunk
+
+            async def aclose(self):
+                upstream.open_responses -= 1
+                await response.stream.aclose()
+
+        return httpx.Response(response.status_code, headers=response.headers, stream=Stream())
+
+
+@pytest.fixture
+async def upstream():
+    stub = TrackedUpstream()
+    mcp_bridge.app.state.http_client = httpx.AsyncClient(transport=stub)
+    try:
+        yield stub
+    finally:
+        await mcp_bridge.app.state.http_client.aclose()
+        del mcp_bridge.app.state.http_client
+
+
+@pytest.fixture
+async def client():
+    transport = httpx.ASGITransport(app=mcp_bridge.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("method", ["POST", "DELETE"])
+async def test_proxies_request_and_response_bodies(upstream, client, method):
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"data": "x" * 100_000}})
+    response = await client.request(
+        method, "/mcp", content=body,
+        headers={"content-type": "application/json", "mcp-session-id": "abc"},
+    )
+
+    assert response.status_code == 200
+    # Still-encoded bytes are relayed, so the encoding header must come along for the client to decode them
+    assert response.headers["content-encoding"] == "gzip"
+    echoed = response.json()
+    assert echoed["method"] == method
+    assert echoed["body"] == body
+
+    headers = dict(echoed["headers"])
+    assert headers["host"] == "localhost:18888"
+    assert "content-length" not in headers
+    assert headers["mcp-session-id"] == "abc"
+
+    assert upstream.open_responses == 0
+
+
+@pytest.mark.anyio
+async def test_relays_sse_stream_verbatim(upstream, client):
+    response = await client.get("/mcp", headers={"accept": "*/*", "accept-encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    # The bridge asks the upstream for an unencoded event stream and relays its bytes unchanged
+    assert response.content == b"data: text/event-stream\n\ndata: identity\n\n"
+    assert upstream.open_responses == 0
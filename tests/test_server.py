@@ -0,0 +1,204 @@
+import functools
+from contextlib import AsyncExitStack
+from datetime import timedelta
+
+import anyio
+import httpx
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+import server
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class StubUpstream(httpx.AsyncBaseTransport):
+    """In-process FastMCP server standing in for the Spark History MCP on :18888."""
+
+    def __init__(self):
+        self._stack = None
+        self._transport = None
+
+    async def start(self):
+        mcp_server = FastMCP("stub", json_response=True)
+
+        @mcp_server.tool()
+        def echo(value: int) -> dict:
+            return {"value": value}
+
+        @mcp_server.tool()
+        async def wait(seconds: float) -> dict:
+            await anyio.sleep(seconds)
+            return {"waited": seconds}
+
+        @mcp_server.tool()
+        def count(start: int = 2**70 + 1) -> dict:
+            return {"start": start}
+
+        app = mcp_server.streamable_http_app()
+        self._stack = AsyncExitStack()
+        await self._stack.enter_async_context(mcp_server.session_manager.run())
+        self._transport = httpx.ASGITransport(app=app)
+
+    async def stop(self):
+        self._transport = None
+        if self._stack is not None:
+            await self._stack.aclose()
+            self._stack = None
+
+    async def restart(self):
+        await self.stop()
+        await self.start()
+
+    async def handle_async_request(self, request):
+        if self._transport is None:
+            raise httpx.ConnectError("upstream is down", request=request)
+        return await self._transport.handle_async_request(request)
+
+
+@pytest.fixture
+async def upstream(monkeypatch):
+    stub = StubUpstream()
+    http_client = httpx.AsyncClient(transport=stub)
+    monkeypatch.setattr(
+        server, "streamable_http_client",
+        functools.partial(server.streamable_http_client, http_client=http_client),
+    )
+    monkeypatch.setattr(
+        server, "mcp_connection", server.MCPConnection(server.MCP_URL, on_reset=server.clear_tools_cache)
+    )
+    await stub.start()
+    try:
+        yield stub
+    finally:
+        await server.mcp_connection.reset()
+        await stub.stop()
+        await http_client.aclose()
+
+
+@pytest.fixture
+async def client():
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+async def call_echo(client, value=1):
+    return await client.post("/api/tools/call", json={"name": "echo", "arguments": {"value": value}})
+
+
+@pytest.mark.anyio
+async def test_reconnects_after_upstream_restart(upstream, client):
+    assert (await call_echo(client)).json()["result"] == [{"value": 1}]
+
+    await upstream.restart()
+
+    # The old session id is unknown to the new upstream: that request fails and drops the session...
+    assert (await call_echo(client)).status_code == 500
+    # ...and the next one transparently opens a fresh session
+    response = await call_echo(client, 2)
+    assert response.status_code == 200
+    assert response.json()["result"] == [{"value": 2}]
+
+
+@pytest.mark.anyio
+async def test_stale_reset_keeps_the_newer_session(upstream, client):
+    assert (await call_echo(client)).status_code == 200
+    first_session, _ = await server.mcp_connection.get()
+
+    await server.mcp_connection.reset()
+    assert (await call_echo(client)).status_code == 200
+    second_session, _ = await server.mcp_connection.get()
+    assert second_session is not first_session
+
+    # A late reset from a request that failed on the first session must not close the second one
+    await server.mcp_connection.reset(first_session)
+    assert server.mcp_connection.session is second_session
+    assert (await call_echo(client, 2)).json()["result"] == [{"value": 2}]
+
+
+@pytest.mark.anyio
+async def test_timeout_only_fails_the_slow_call(upstream, client, monkeypatch):
+    monkeypatch.setattr(server, "MCP_TIMEOUT", timedelta(seconds=0.5))
+
+    async def call_wait(seconds):
+        return await client.post("/api/tools/call", json={"name": "wait", "arguments": {"seconds": seconds}})
+
+    assert (await call_echo(client)).status_code == 200
+    session, _ = await server.mcp_connection.get()
+
+    responses = {}
+    async with anyio.create_task_group() as tg:
+        async def run(seconds):
+            responses[seconds] = await call_wait(seconds)
+
+        tg.start_soon(run, 2)
+        tg.start_soon(run, 0.2)
+
+    assert responses[2].status_code == 500
+    assert responses[0.2].json()["result"] == [{"waited": 0.2}]
+    assert server.mcp_connection.session is session
+
+
+@pytest.mark.anyio
+async def test_fails_fast_when_upstream_is_down(upstream, client):
+    assert (await call_echo(client)).status_code == 200
+
+    await upstream.stop()
+
+    with anyio.fail_after(5):
+        assert (await call_echo(client)).status_code == 500
+        assert (await call_echo(client)).status_code == 500
+        assert (await client.get("/api/tools")).status_code == 503
+
+    await upstream.start()
+    assert (await call_echo(client, 3)).json()["result"] == [{"value": 3}]
+
+
+@pytest.mark.anyio
+async def test_tool_results_keep_integers_wider_than_64_bits(upstream, client):
+    response = await call_echo(client, 2**70 + 1)
+    assert response.status_code == 200
+    assert response.json()["result"] == [{"value": 2**70 + 1}]
+
+
+@pytest.mark.anyio
+async def test_tools_list_is_cached_and_revalidated_with_etag(upstream, client):
+    first = await client.get("/api/tools")
+    assert first.status_code == 200
+    assert [tool["name"] for tool in first.json()["tools"]] == ["echo", "wait", "count"]
+    etag = first.headers["etag"]
+
+    revalidated = await client.get("/api/tools", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+
+    # Dropping the session also drops the cached list, since the upstream may have changed
+    await server.mcp_connection.reset()
+    assert server.app.state.tools_cache is None
+
+
+@pytest.mark.anyio
+async def test_tools_list_keeps_integers_wider_than_64_bits(upstream, client):
+    response = await client.get("/api/tools")
+    assert response.status_code == 200
+    count = next(tool for tool in response.json()["tools"] if tool["name"] == "count")
+    assert count["inputSchema"]["properties"]["start"]["default"] == 2**70 + 1
+
+
+@pytest.mark.anyio
+async def test_tools_list_from_a_dropped_session_is_not_cached(upstream, client, monkeypatch):
+    request = server.mcp_connection.request
+
+    async def request_then_reset(method, *args):
+        result = await request(method, *args)
+        await server.mcp_connection.reset()
+        return result
+
+    monkeypatch.setattr(server.mcp_connection, "request", request_then_reset)
+
+    assert (await client.get("/api/tools")).status_code == 200
+    assert server.app.state.tools_cache is None